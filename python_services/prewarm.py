@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Copy-on-write prewarm supervisor for the AI vendor selection service
+
+Initializes the agent once in a parent process, then forks one child per
+newline-delimited JSON request. Children inherit the warmed interpreter
+state (imports, compiled workflow, JIT'd scoring kernel) as
+copy-on-write pages, so per-request startup cost disappears while
+process isolation for crash safety is preserved.
+
+Unix-only (requires os.fork). Usage:
+    OPENAI_API_KEY=... python prewarm.py < requests.ndjson
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+from ai_vendor_selection_agent import AIVendorSelectionAgent
+from ai_vendor_selection_api import AIVendorSelectionAPI, _loads, _write_line
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+API = AIVendorSelectionAPI()
+
+def _reset_inherited_clients(api_key: str) -> None:
+    """Recreate the agent's network clients after a fork.
+
+    Sockets inside the parent's HTTP clients must not be shared across
+    processes. The class-level compiled workflow has its node callables
+    bound to the parent agent, so it must be dropped too — otherwise the
+    child's graph would keep executing against the parent instance and
+    its pre-fork clients. Recompiling plus rebuilding the agent is still
+    cheap next to the inherited copy-on-write state (imports, JIT cache).
+    """
+    AIVendorSelectionAgent._COMPILED_WORKFLOW = None
+    API.agent = AIVendorSelectionAgent(api_key=api_key)
+
+def main() -> None:
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise SystemExit("OPENAI_API_KEY is required")
+
+    # Warm everything once in the parent: imports, agent construction,
+    # workflow compilation and the scoring-kernel JIT warmup
+    asyncio.run(API.initialize_agent(api_key))
+    logger.info("Prewarm parent initialized, forking one child per request")
+
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if not line:
+            continue
+
+        pid = os.fork()
+        if pid == 0:
+            # Child: serve exactly one request and exit
+            status = 0
+            try:
+                _reset_inherited_clients(api_key)
+                result = asyncio.run(API.process_selection_request(_loads(line)))
+                _write_line(result)
+            except Exception as e:
+                logger.error("Request failed in prewarmed child: %s", str(e))
+                status = 1
+            os._exit(status)
+
+        os.waitpid(pid, 0)
+
+if __name__ == "__main__":
+    main()
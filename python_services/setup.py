@@ -0,0 +1,17 @@
+"""
+Build script for the optional Cython fast paths
+
+Usage:
+    python setup.py build_ext --inplace
+
+The services run fine without the compiled extensions; they only
+unlock the native parse loop in vendor_parse.pyx.
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="ai-vendor-selection-native",
+    ext_modules=cythonize(["vendor_parse.pyx"], language_level=3),
+)